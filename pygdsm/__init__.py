@@ -8,6 +8,23 @@ from .component_data import download_map_data as download_map_data
 GlobalSkyModel08 = GlobalSkyModel
 GSMObserver08 = GSMObserver
 
+# Lookup tables for init_gsm() and init_observer(). 'gsm' is shorthand for GSM08
+_GSM_REGISTRY = {
+    'gsm': GlobalSkyModel,
+    'gsm08': GlobalSkyModel,
+    'gsm16': GlobalSkyModel16,
+    'lfsm': LowFrequencySkyModel,
+    'haslam': HaslamSkyModel,
+}
+
+_OBS_REGISTRY = {
+    'gsm': GSMObserver,
+    'gsm08': GSMObserver,
+    'gsm16': GSMObserver16,
+    'lfsm': LFSMObserver,
+    'haslam': HaslamObserver,
+}
+
 def init_gsm(gsm_name: str = "gsm08"):
     """Initialize a GDSM object by ID/name
 
@@ -28,20 +45,11 @@ def init_gsm(gsm_name: str = "gsm08"):
         sky_model (various): Corresponding sky model
     """
     gsm_name = gsm_name.lower().strip()
-
-    if gsm_name == 'gsm': # Shorthand for GSM08
-        return GlobalSkyModel()
-    elif gsm_name == 'gsm08':
-        return GlobalSkyModel()
-    elif gsm_name == 'gsm16':
-        return GlobalSkyModel16()
-    elif gsm_name == 'lfsm':
-        return LowFrequencySkyModel()
-    elif gsm_name == 'haslam':
-        return HaslamSkyModel()
-    else:
+    try:
+        sky_model_cls = _GSM_REGISTRY[gsm_name]
+    except KeyError:
         raise ValueError(f'Invalid model specification "{gsm_name}"')
-
+    return sky_model_cls()
 
 
 def init_observer(gsm_name: str = "gsm08"):
@@ -64,16 +72,8 @@ def init_observer(gsm_name: str = "gsm08"):
         observer (various): Corresponding sky model observer
     """
     gsm_name = gsm_name.lower().strip()
-
-    if gsm_name == 'gsm': # Shorthand for GSM08
-        return GSMObserver()
-    elif gsm_name == 'gsm08':
-        return GSMObserver()
-    elif gsm_name == 'gsm16':
-        return GSMObserver16()
-    elif gsm_name == 'lfsm':
-        return LFSMObserver()
-    elif gsm_name == 'haslam':
-        return HaslamObserver()
-    else:
+    try:
+        observer_cls = _OBS_REGISTRY[gsm_name]
+    except KeyError:
         raise ValueError(f'Invalid model specification "{gsm_name}"')
+    return observer_cls()
@@ -5,7 +5,7 @@ from astropy.coordinates import SkyCoord
 from astropy.time import Time
 
 from pygdsm.plot_utils import show_plt
-from pygdsm.utils import hpix2sky, sky2hpix
+from pygdsm.utils import hpix2sky, pix2ang_cached, sky2hpix
 
 
 class BaseObserver(ephem.Observer):
@@ -21,6 +21,12 @@ class BaseObserver(ephem.Observer):
     which allows all-sky images for a given point on earth to be produced.
     """
 
+    # Maximum number of zenith pointings to keep in the rotation cache. Each entry
+    # holds an int32 pix0 and a bool mask: 5 bytes/pixel, ~63 MB at NSIDE=1024.
+    # The pix0 in use is converted to intp, as np.take is slower with int32 indexes.
+    # Per observer, _setup() also keeps _xyz, _eq_radec, _nest2ring and the NESTED sky.
+    _rot_cache_size = 2
+
     def __init__(self, gsm):
         """Initialize the Observer object.
 
@@ -38,10 +44,32 @@ class BaseObserver(ephem.Observer):
         self.gsm.generate(self._freq)
         self._n_pix = hp.get_map_size(self.gsm.generated_map_data)
         self._n_side = hp.npix2nside(self._n_pix)
-        self._theta, self._phi = hp.pix2ang(self._n_side, np.arange(self._n_pix))
+        theta, phi = pix2ang_cached(self._n_side)
+        # Unit vectors for each pixel, stored as (3, Npix) for fast matrix rotation
+        self._xyz = np.ascontiguousarray(hp.ang2vec(theta, phi).T)
+
+        # Transform from Galactic coordinates to Equatorial. This is time-independent,
+        # so the RA/DEC grid is only computed once.
+        eq_theta, eq_phi = hp.Rotator(coord=["G", "C"])(theta, phi)
+
+        # Convert from Equatorial colatitude and longitude to normal RA and DEC
+        eq_dec = 90.0 - np.abs(eq_theta * (180 / np.pi))
+        eq_ra = ((eq_phi + 2 * np.pi) % (2 * np.pi)) * (180 / np.pi)
+
+        # Arrays indexed by pix0 (sky, mask, RA/DEC grid) are stored in NESTED ordering,
+        # so the sky[pix0] gather reads neighbouring pixels from nearby memory.
+        # The observed sky is still returned in RING ordering.
+        self._nest2ring = hp.nest2ring(self._n_side, np.arange(self._n_pix))
+        # RA and DEC are stacked into one (2, Npix) array so both are gathered in a single pass
+        self._eq_radec = np.stack((eq_ra, eq_dec))[:, self._nest2ring]
+        # The sky model map the NESTED sky was built from, to detect when it is replaced
+        self._sky_source = self.gsm.generated_map_data
+        self._sky = self._sky_source[self._nest2ring]
 
         self._pix0 = None
         self._mask = None
+        # Cache of (pix0, mask), keyed by zenith RA/DEC and horizon elevation
+        self._rot_cache = {}
         self._horizon_elevation = 0.0
         self._observed_ra = None
         self._observed_dec = None
@@ -51,8 +79,8 @@ class BaseObserver(ephem.Observer):
 
         Parameters
         ----------
-        freq: float
-            Frequency of map to generate, in units of MHz (default).
+        freq: float or np.array
+            Frequency (or frequencies) of map to generate, in units of MHz (default).
         obstime: astropy.time.Time
             Time of observation to generate
         horizon_elevation: float
@@ -61,16 +89,26 @@ class BaseObserver(ephem.Observer):
         Returns
         -------
         observed_sky: np.array
-            Numpy array representing the healpix image, centered on zenith,
-            with below the horizon masked.
+            Numpy array representing the healpix image (RING ordering), centered
+            on zenith, with below the horizon masked. If an array of frequencies is
+            passed, the output has shape (n_freq, Npix).
         """
+        # The sky model may also be regenerated directly, e.g. by ov.gsm.generate() or
+        # ov.gsm.set_interpolation_method(), so track the map _sky was built from
+        if self.gsm.generated_map_data is not self._sky_source:
+            self._freq = self.gsm.generated_map_freqs.to_value(self.gsm.freq_unit)
+
         # Check to see if frequency has changed.
         if freq is not None:
-            if not np.isclose(freq, self._freq):
+            if np.shape(freq) != np.shape(self._freq) or not np.allclose(freq, self._freq):
                 self.gsm.generate(freq)
                 self._freq = freq
 
-        sky = self.gsm.generated_map_data
+        if self.gsm.generated_map_data is not self._sky_source:
+            self._sky_source = self.gsm.generated_map_data
+            self._sky = self._sky_source[..., self._nest2ring]
+
+        sky = self._sky
 
         # Check if time has changed -- astropy allows None == Time() comparison
         if obstime == self._time or obstime is None:
@@ -92,63 +130,80 @@ class BaseObserver(ephem.Observer):
         if self._horizon_elevation < 0:
                 raise ValueError(f"Horizon elevation must be greater or equal to 0 degrees ({np.rad2deg(horizon_elevation)=}).")
 
-        # Match pyephem convertion -- string is degrees, int/float is rad
-        horizon_elevation = ephem.degrees(horizon_elevation or 0.0)
-        if self._horizon_elevation == horizon_elevation:
-            horizon_has_changed = False
-        else:
-            self._horizon_elevation = horizon_elevation
-            horizon_has_changed = True
-
-        # Checking this separately encase someone tries to be smart and sets both the attribute and kwarg
-        if self._horizon_elevation < 0:
-                raise ValueError(f"Horizon elevation must be greater or equal to 0 degrees ({np.rad2deg(horizon_elevation)=}).")
-
         # Rotation is quite slow, only recompute if time or frequency has changed, or it has never been run
         if time_has_changed or self.observed_sky is None or horizon_has_changed:
             # Get RA and DEC of zenith
             ra_zen, dec_zen = self.radec_of(0, np.pi / 2)
-            sc_zen = SkyCoord(ra_zen, dec_zen, unit=("rad", "rad"))
-            pix_zen = sky2hpix(self._n_side, sc_zen)
-            vec_zen = hp.pix2vec(self._n_side, pix_zen)
-
-            # Convert to degrees
-            ra_zen *= 180 / np.pi
-            dec_zen *= 180 / np.pi
-
-            # Generate below-horizon mask using query_disc
-            mask = np.ones(shape=self._n_pix, dtype='bool')
-            pix_visible = hp.query_disc(self._n_side, vec=vec_zen, radius=np.pi/2 - self._horizon_elevation)
-            mask[pix_visible] = 0
-            self._mask = mask
-
-            # Transform from Galactic coordinates to Equatorial
-            rot = hp.Rotator(coord=["G", "C"])
-            eq_theta, eq_phi = rot(self._theta, self._phi)
-
-            # Convert from Equatorial colatitude and longitude to normal RA and DEC
-            dec = 90.0 - np.abs(eq_theta * (180 / np.pi))
-            ra = ((eq_phi + 2 * np.pi) % (2 * np.pi)) * (180 / np.pi)
-
-            # Apply rotation to convert from Galactic to Equatorial and center on zenith
-            hrot = hp.Rotator(rot=[ra_zen, dec_zen], coord=["G", "C"], inv=True)
-            g0, g1 = hrot(self._theta, self._phi)
-            pix0 = hp.ang2pix(self._n_side, g0, g1)
-            self._pix0 = pix0
-
-            dec_rotated = dec[self._pix0]
-            ra_rotated = ra[self._pix0]
+
+            # Zenith often repeats (e.g. the same LST on different days), so reuse cached results
+            key = (round(ra_zen * 180 / np.pi, 4), round(dec_zen * 180 / np.pi, 4), float(self._horizon_elevation))
+            if key not in self._rot_cache:
+                if len(self._rot_cache) >= self._rot_cache_size:
+                    # Evict the oldest entry (dicts preserve insertion order)
+                    del self._rot_cache[next(iter(self._rot_cache))]
+                self._rot_cache[key] = self._compute_pix0_mask(ra_zen, dec_zen)
+            pix0, self._mask = self._rot_cache[key]
+            # np.take converts non-intp indexes on every call, so convert once here
+            self._pix0 = pix0.astype(np.intp)
+
+            ra_rotated, dec_rotated = np.take(self._eq_radec, self._pix0, axis=1, mode='wrap')
             self._observed_ra = ra_rotated
             self._observed_dec = dec_rotated
 
-        sky_rotated = sky[self._pix0]
-        mask_rotated = self._mask[self._pix0]
+        # pix0 is always in range, so mode='wrap' is used to skip np.take's buffered bounds checking
+        sky_rotated = np.take(sky, self._pix0, axis=-1, mode='wrap')
+        # The mask is the same for all frequencies, so it is rotated once and copied to the other rows
+        mask_rotated = np.take(self._mask, self._pix0, mode='wrap')
+        if sky_rotated.ndim > 1:
+            mask_rotated = np.broadcast_to(mask_rotated, sky_rotated.shape).copy()
 
-        self.observed_sky = hp.ma(sky_rotated)
-        self.observed_sky.mask = mask_rotated
+        # Wrap the new arrays without copying, using healpy's UNSEEN as fill value like hp.ma()
+        self.observed_sky = np.ma.MaskedArray(sky_rotated, mask=mask_rotated, fill_value=hp.UNSEEN, copy=False)
 
         return self.observed_sky
 
+    def _compute_pix0_mask(self, ra_zen, dec_zen):
+        """Compute the pixel mapping and below-horizon mask for a given zenith.
+
+        Parameters
+        ----------
+        ra_zen: float
+            Right ascension of zenith, in radians
+        dec_zen: float
+            Declination of zenith, in radians
+
+        Returns
+        -------
+        pix0: np.array
+            Pixel indexes (NESTED) that rotate the sky so it is centered on zenith
+        mask: np.array
+            Below-horizon mask (NESTED)
+        """
+        sc_zen = SkyCoord(ra_zen, dec_zen, unit=("rad", "rad"))
+        pix_zen = sky2hpix(self._n_side, sc_zen)
+        vec_zen = hp.pix2vec(self._n_side, pix_zen)
+
+        # Convert to degrees
+        ra_zen *= 180 / np.pi
+        dec_zen *= 180 / np.pi
+
+        # Generate below-horizon mask using query_disc
+        mask = np.ones(shape=self._n_pix, dtype='bool')
+        pix_visible = hp.query_disc(self._n_side, vec=vec_zen, radius=np.pi/2 - self._horizon_elevation, nest=True)
+        mask[pix_visible] = 0
+
+        # Apply rotation to convert from Galactic to Equatorial and center on zenith
+        # The rotation is applied as a single 3x3 matrix product on the pixel unit vectors
+        hrot = hp.Rotator(rot=[ra_zen, dec_zen], coord=["G", "C"], inv=True)
+        xyz_rot = hrot.mat @ self._xyz
+        pix0 = hp.vec2pix(self._n_side, xyz_rot[0], xyz_rot[1], xyz_rot[2], nest=True)
+        # Pixel indexes fit in int32 for NSIDE <= 8192, halving the cached footprint.
+        # generate() converts back to intp when a cache entry is used.
+        if self._n_pix < 2**31:
+            pix0 = pix0.astype(np.int32)
+
+        return pix0, mask
+
     def view(self, logged=False, show=False, **kwargs):
         """View the local sky, in orthographic projection.
 
@@ -177,16 +232,19 @@ class BaseObserver(ephem.Observer):
         ra_deg = ra_rad / np.pi * 180
         dec_deg = dec_rad / np.pi * 180
 
-        # Apply rotation
+        # Apply rotation: derotate from zenith, then convert Equatorial to Galactic.
+        # Both are composed into one rotation so the sky is only resampled once.
         derotate = hp.Rotator(rot=[ra_deg, dec_deg])
-        g0, g1 = derotate(self._theta, self._phi)
-        pix0 = hp.ang2pix(self._n_side, g0, g1)
-        sky = sky[pix0]
-
         coordrotate = hp.Rotator(coord=["C", "G"], inv=True)
-        g0, g1 = coordrotate(self._theta, self._phi)
-        pix0 = hp.ang2pix(self._n_side, g0, g1)
-        sky = sky[pix0]
+        xyz_rot = derotate.mat @ coordrotate.mat @ self._xyz
+        pix0 = hp.vec2pix(self._n_side, xyz_rot[0], xyz_rot[1], xyz_rot[2])
+
+        sky = np.ma.MaskedArray(
+            np.take(sky.data, pix0, axis=-1, mode='wrap'),
+            mask=np.take(sky.mask, pix0, axis=-1, mode='wrap'),
+            fill_value=hp.UNSEEN,
+            copy=False,
+        )
         return sky
 
     def view_observed_gsm(self, logged=False, show=False, **kwargs):
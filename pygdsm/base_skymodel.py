@@ -1,13 +1,25 @@
 import os
+import threading
+import weakref
 
 import h5py
 import healpy as hp
 import numpy as np
+from astropy import units
+from astropy.coordinates import Galactic
 from astropy.io import fits
 
 from .plot_utils import show_plt
 
 
+FITS_SIGNATURE = (
+    b"\x53\x49\x4d\x50\x4c\x45\x20\x20\x3d\x20\x20\x20\x20\x20"
+    b"\x20\x20\x20\x20\x20\x20\x20\x20\x20\x20\x20\x20\x20\x20"
+    b"\x20\x54"
+)
+HDF5_SIGNATURE = b"\x89HDF\r\n\x1a\n"
+
+
 def is_fits(filepath):
     """
     Check if file is a FITS file
@@ -18,11 +30,6 @@ def is_fits(filepath):
     filepath: str
         Path to file
     """
-    FITS_SIGNATURE = (
-        b"\x53\x49\x4d\x50\x4c\x45\x20\x20\x3d\x20\x20\x20\x20\x20"
-        b"\x20\x20\x20\x20\x20\x20\x20\x20\x20\x20\x20\x20\x20\x20"
-        b"\x20\x54"
-    )
     try:
         with open(str(filepath), "rb") as f:
             return f.read(30) == FITS_SIGNATURE
@@ -31,9 +38,45 @@ def is_fits(filepath):
         return False
 
 
+def get_file_format(filepath):
+    """
+    Identify a data file as HDF5 or FITS, reading its header only once
+    Returns 'hdf5', 'fits' or None
+
+    Parameters
+    ----------
+    filepath: str
+        Path to file
+    """
+    with open(str(filepath), "rb") as f:
+        header = f.read(30)
+    if header.startswith(HDF5_SIGNATURE):
+        return "hdf5"
+    elif header == FITS_SIGNATURE:
+        return "fits"
+    elif h5py.is_hdf5(filepath):
+        # HDF5 file with a user block, signature is not at the start of the file
+        return "hdf5"
+    return None
+
+
 class BaseSkyModel(object):
     """Global sky model (GSM) class for generating sky models."""
 
+    # Arrays read from HDF5 files (or derived from them), shared between instances while
+    # any of them are in use. Keyed by (filepath, dataset names, ...). Entries are dropped
+    # once no instance holds them.
+    _h5_cache = weakref.WeakValueDictionary()
+    _h5_cache_lock = threading.RLock()
+
+    # HDF5 chunk cache settings used when opening data files. The default 1 MB cache
+    # is smaller than a single compressed chunk of the larger maps, so chunks would
+    # be decompressed again on every partial read.
+    _h5_chunk_cache = dict(rdcc_nbytes=64 * 1024 ** 2, rdcc_nslots=1009, rdcc_w0=0.75)
+
+    # Scale factors from common frequency units to MHz, see _to_mhz()
+    _MHZ_PER_UNIT = {"Hz": 1e-6, "kHz": 1e-3, "MHz": 1.0, "GHz": 1e3}
+
     def __init__(self, name, filepath, freq_unit, data_unit, basemap):
         """Initialise basic sky model class
 
@@ -47,14 +90,19 @@ class BaseSkyModel(object):
 
         Notes
         -----
-        Any GSM needs to supply a generate() function
+        Any GSM needs to supply a generate() function. Subclasses should load the
+        data they need into memory during __init__, then close the file.
         """
         self.name = name
+        self.filepath = filepath
+        self.h5 = None
+        self.fits = None
         if os.path.exists(filepath):
-            if h5py.is_hdf5(filepath):
-                self.h5 = h5py.File(filepath, "r")
-            elif is_fits(filepath):
-                self.fits = fits.open(filepath, "readonly")
+            file_format = get_file_format(filepath)
+            if file_format == "hdf5":
+                self.h5 = h5py.File(filepath, "r", **self._h5_chunk_cache)
+            elif file_format == "fits":
+                self.fits = fits.open(filepath, "readonly", memmap=True)
             else:
                 raise RuntimeError(f"Cannot read HDF5/FITS file {filepath}")
         else:
@@ -62,10 +110,115 @@ class BaseSkyModel(object):
         self.basemap = basemap
         self.freq_unit = freq_unit
         self.data_unit = data_unit
+        # Precision of the loaded map data, and so of generated maps. This is fixed
+        # at load time, so it is private. Spectral interpolation is done in float64.
+        self._dtype = np.float32
 
         self.generated_map_data = None
         self.generated_map_freqs = None
 
+    def _read_h5(self, *keys, dtype=None):
+        """Read dataset(s) from the HDF5 file into memory.
+
+        Arrays are cached and shared with other sky models reading the same file,
+        so they are returned read-only. If several keys are given, the datasets
+        are stacked into a single array.
+
+        Parameters
+        ----------
+        keys: str
+            Name(s) of HDF5 dataset to read
+        dtype: np.dtype
+            Convert data to this type on read. Defaults to the type stored on disk.
+        """
+        dtype = None if dtype is None else np.dtype(dtype)
+
+        def load():
+            if self.h5:
+                return self._stack_h5(self.h5, keys, dtype)
+            with h5py.File(self.filepath, "r", **self._h5_chunk_cache) as h5:
+                return self._stack_h5(h5, keys, dtype)
+
+        return self._cached((str(self.filepath), keys, dtype), load)
+
+    def _cached(self, cache_key, load):
+        """Get an array from the shared cache, calling load() to create it if needed.
+
+        Arrays are shared with other sky models, so they are returned read-only.
+
+        Parameters
+        ----------
+        cache_key: tuple
+            Key for array, should start with (filepath, dataset names)
+        load: callable
+            Function returning the array if it is not in the cache
+        """
+        with self._h5_cache_lock:
+            data = self._h5_cache.get(cache_key)
+            if data is None:
+                data = load()
+                data.flags.writeable = False
+                self._h5_cache[cache_key] = data
+        return data
+
+    @staticmethod
+    def _stack_h5(h5, keys, dtype=None):
+        """Read dataset(s) from an open HDF5 file, stacking if more than one key given.
+
+        Datasets are read straight into one preallocated array (with any type
+        conversion done by HDF5), so no intermediate copies are made.
+        """
+        dsets = [h5[key] for key in keys]
+        if dtype is None:
+            dtype = dsets[0].dtype
+        if len(dsets) == 1:
+            data = np.empty(dsets[0].shape, dtype=dtype)
+            dsets[0].read_direct(data)
+        else:
+            data = np.empty((len(dsets),) + dsets[0].shape, dtype=dtype)
+            for dset, row in zip(dsets, data):
+                dset.read_direct(row)
+        return data
+
+    def _to_mhz(self, freqs):
+        """Convert frequencies in freq_unit to a 1-D array of values in MHz.
+
+        Common units are converted with a plain scale factor; astropy is only used
+        to convert other units.
+
+        Parameters
+        ----------
+        freqs: float or np.array
+            Frequency or frequencies, in units of freq_unit
+        """
+        scale = self._MHZ_PER_UNIT.get(self.freq_unit)
+        if scale is None:
+            freqs_mhz = (np.array(freqs) * units.Unit(self.freq_unit)).to("MHz").value
+        else:
+            freqs_mhz = np.asarray(freqs, dtype=np.float64) * scale
+        return np.atleast_1d(freqs_mhz)
+
+    def _out_view(self, out, n_freq):
+        """Check a user-supplied output array for generate(), returning a (n_freq, Npix) view.
+
+        Parameters
+        ----------
+        out: np.array or None
+            Output array, with the shape and dtype of the map(s) generate() returns.
+        n_freq: int
+            Number of frequencies being generated
+        """
+        if out is None:
+            return None
+        npix = hp.nside2npix(self.nside)
+        shape = (npix,) if n_freq == 1 else (n_freq, npix)
+        if out.shape != shape or out.dtype != self._dtype:
+            raise ValueError(
+                f"out must have shape {shape} and dtype {np.dtype(self._dtype)}, "
+                f"not {out.shape} and {out.dtype}"
+            )
+        return out.reshape(n_freq, npix)
+
     def generate(self, freqs):
         raise NotImplementedError
 
@@ -126,9 +279,9 @@ class BaseSkyModel(object):
         if freqs is not None:
             self.generate(freqs)
 
-        pix = hp.ang2pix(
-            self.nside, coords.galactic.l.deg, coords.galactic.b.deg, lonlat=True
-        )
+        # Transform to galactic once (if needed), rather than once per coordinate
+        gal = coords if isinstance(coords.frame, Galactic) else coords.galactic
+        pix = hp.ang2pix(self.nside, gal.l.deg, gal.b.deg, lonlat=True)
         if self.generated_map_data.ndim == 2:
             return self.generated_map_data[:, pix] + T_cmb
         else:
@@ -137,9 +290,31 @@ class BaseSkyModel(object):
     def write_fits(self, filename):
         """Write out map data as FITS file.
 
+        If the filename ends in .h5 or .hdf5, write_hdf5() is used instead.
+
         Parameters
         ----------
         filename: str
             file name for output FITS file
         """
-        hp.write_map(filename, self.generated_map_data, column_units=self.data_unit)
+        if str(filename).endswith((".h5", ".hdf5")):
+            self.write_hdf5(filename)
+        else:
+            hp.write_map(filename, self.generated_map_data, column_units=self.data_unit)
+
+    def write_hdf5(self, filename):
+        """Write out map data as HDF5 file.
+
+        Map data are written to a chunked, LZF-compressed dataset called 'map',
+        which is much faster than FITS for large maps.
+
+        Parameters
+        ----------
+        filename: str
+            file name for output HDF5 file
+        """
+        data = self.generated_map_data
+        chunks = (1,) * (data.ndim - 1) + (min(65536, data.shape[-1]),)
+        with h5py.File(filename, "w") as h5:
+            h5.create_dataset("map", data=data, chunks=chunks, compression="lzf")
+            h5["map"].attrs["units"] = self.data_unit
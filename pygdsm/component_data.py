@@ -1,3 +1,7 @@
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from astropy.utils.data import download_file
 from astropy.config import get_cache_dir
 
@@ -16,10 +20,37 @@ DATA_URLS = [
             HASLAM_DATA_URL
             ]
 
+@functools.lru_cache(maxsize=None)
+def _download_cached(url):
+    return download_file(url, cache=True, show_progress=True)
+
+
+def get_data_filepath(url):
+    """Return local path to a data file, downloading it to the astropy cache if needed.
+
+    The path is remembered for the session, so constructing further sky models
+    does not go back to the astropy cache (or network) for the same file.
+
+    Parameters
+    ----------
+    url: str
+        URL of data file
+    """
+    filepath = _download_cached(url)
+    if not os.path.exists(filepath):
+        # astropy cache was cleared since the file was first fetched
+        _download_cached.cache_clear()
+        filepath = _download_cached(url)
+    return filepath
+
+
 def download_map_data():
-    """Download component data."""
+    """Download component data.
+
+    Files are fetched concurrently, so total time is set by the slowest download.
+    """
     print("Checking for component data files...")
-    for URL in DATA_URLS:
-        download_file(URL, cache=True, show_progress=True)
+    with ThreadPoolExecutor(max_workers=len(DATA_URLS)) as executor:
+        list(executor.map(get_data_filepath, DATA_URLS))
     CACHE_PATH = get_cache_dir()
     print(f"Data saved in {CACHE_PATH}")
\ No newline at end of file
@@ -20,12 +20,11 @@ PCA data from: space.mit.edu/home/angelica/gsm
 
 import numpy as np
 from astropy import units
-from astropy.utils.data import download_file
 from scipy.interpolate import interp1d, pchip
 
 from .base_observer import BaseObserver
 from .base_skymodel import BaseSkyModel
-from .component_data import GSM_DATA_URL
+from .component_data import GSM_DATA_URL, get_data_filepath
 from .plot_utils import show_plt
 
 T_CMB = 2.725
@@ -76,22 +75,14 @@ class GlobalSkyModel(BaseSkyModel):
         """
 
         # download component data as needed using astropy cache
-        GSM_FILEPATH = download_file(
-            GSM_DATA_URL,
-            cache=True,
-            show_progress=True,
-        )
+        GSM_FILEPATH = get_data_filepath(GSM_DATA_URL)
 
-        try:
-            assert basemap in {"5deg", "wmap", "haslam"}
-        except AssertionError:
+        if basemap not in {"5deg", "wmap", "haslam"}:
             raise RuntimeError(
                 "GSM basemap unknown: %s. Choose '5deg', 'haslam' or 'wmap'" % basemap
             )
 
-        try:
-            assert interpolation in {"cubic", "pchip"}
-        except AssertionError:
+        if interpolation not in {"cubic", "pchip"}:
             raise RuntimeError("Interpolation must be set to either 'cubic' or 'pchip'")
 
         data_unit = "K"
@@ -103,8 +94,10 @@ class GlobalSkyModel(BaseSkyModel):
         self.include_cmb = include_cmb
 
         self.pca_map_data = None
+        self._pca_map_T = None
         self.interp_comps = None
         self.update_interpolants()
+        self.h5.close()
 
         self.generated_map_data = None
         self.generated_map_freqs = None
@@ -118,37 +111,64 @@ class GlobalSkyModel(BaseSkyModel):
             "wmap": "component_maps_23klocked",
         }
         pca_map_key = pca_map_dict[self.basemap]
-        self.pca_map_data = self.h5[pca_map_key][:]
+        # Maps are stored as (Npix, n_comp). Keep them component-major at output
+        # precision, so the matrix product in generate() streams each component
+        # map straight through BLAS. pca_map_data is a (Npix, n_comp) view of this.
+        # The transposed copy is shared with other instances, like data read from the file.
+        def load_pca_map_T():
+            return np.ascontiguousarray(self._read_h5(pca_map_key, dtype=self._dtype).T)
+
+        self._pca_map_T = self._cached(
+            (str(self.filepath), (pca_map_key,), np.dtype(self._dtype), "T"), load_pca_map_T
+        )
+        self.pca_map_data = self._pca_map_T.T
 
         # Now, load the PCA eigenvalues
-        pca_table = self.h5["components"][:]
+        pca_table = self._read_h5("components")
         pca_freqs_mhz = pca_table[:, 0]
         pca_scaling = pca_table[:, 1]
-        pca_comps = pca_table[:, 2:].T
+        pca_comps = pca_table[:, 2:]
 
         # Interpolate to the desired frequency values
         ln_pca_freqs = np.log(pca_freqs_mhz)
 
         if self.interpolation_method == "cubic":
             spl_scaling = interp1d(ln_pca_freqs, np.log(pca_scaling), kind="cubic")
-            spl1 = interp1d(ln_pca_freqs, pca_comps[0], kind="cubic")
-            spl2 = interp1d(ln_pca_freqs, pca_comps[1], kind="cubic")
-            spl3 = interp1d(ln_pca_freqs, pca_comps[2], kind="cubic")
+            spl_comps = interp1d(ln_pca_freqs, pca_comps, kind="cubic", axis=0)
 
         else:
             spl_scaling = pchip(ln_pca_freqs, np.log(pca_scaling))
-            spl1 = pchip(ln_pca_freqs, pca_comps[0])
-            spl2 = pchip(ln_pca_freqs, pca_comps[1])
-            spl3 = pchip(ln_pca_freqs, pca_comps[2])
-        self.interp_comps = (spl_scaling, spl1, spl2, spl3)
+            spl_comps = pchip(ln_pca_freqs, pca_comps, axis=0)
+        self.interp_comps = (spl_scaling, spl_comps)
+
+    def _eval_weights(self, ln_freqs):
+        """Evaluate PCA component weights at given frequencies.
+
+        Parameters
+        ----------
+        ln_freqs: np.array
+            Natural log of frequencies, in MHz
+
+        Returns
+        -------
+        weights: np.array
+            Component weights with overall scaling applied, shape (n_freq, n_comp)
+        """
+        spl_scaling, spl_comps = self.interp_comps
+        comps = spl_comps(ln_freqs)
+        scaling = np.exp(spl_scaling(ln_freqs))
+        return comps * scaling[:, None]
 
-    def generate(self, freqs):
+    def generate(self, freqs, out=None):
         """Generate a global sky model at a given frequency or frequencies
 
         Parameters
         ----------
         freqs: float or np.array
             Frequency for which to return GSM model
+        out: np.array (optional)
+            Array to write output into, instead of allocating a new one. Must
+            have the shape and dtype (float32) of the returned map(s).
 
         Returns
         -------
@@ -158,34 +178,29 @@ class GlobalSkyModel(BaseSkyModel):
 
         """
         # convert frequency values into Hz
+        freqs_mhz = self._to_mhz(freqs)
         freqs = np.array(freqs) * units.Unit(self.freq_unit)
-        freqs_mhz = freqs.to("MHz").value
-
-        if isinstance(freqs_mhz, float):
-            freqs_mhz = np.array([freqs_mhz])
 
-        try:
-            assert np.min(freqs_mhz) >= 10
-            assert np.max(freqs_mhz) <= 94000
-        except AssertionError:
+        if not (np.min(freqs_mhz) >= 10 and np.max(freqs_mhz) <= 94000):
             raise RuntimeError("Frequency values lie outside 10 MHz < f < 94 GHz")
 
-        # Load interpolators and do interpolation
-        ln_freqs = np.log(freqs_mhz)
-        spl_scaling, spl1, spl2, spl3 = self.interp_comps
-        comps = np.row_stack((spl1(ln_freqs), spl2(ln_freqs), spl3(ln_freqs)))
-        scaling = np.exp(spl_scaling(ln_freqs))
-
-        # Finally, compute the dot product via einsum (awesome function)
-        # c=comp, f=freq, p=pixel. We want to dot product over c for each freq
-        # print comps.shape, self.pca_map_data.shape, scaling.shape
-        map_out = np.einsum("cf,pc,f->fp", comps, self.pca_map_data, scaling)
+        # Interpolate component weights, then sum components for each freq
+        # with a single (freq, comp) x (comp, pixel) matrix product
+        weights = self._eval_weights(np.log(freqs_mhz)).astype(self._dtype)
+        out_view = self._out_view(out, len(weights))
+        if len(weights) == 1:
+            # Single frequency: a matrix-vector product gives the 1-D map directly
+            map_out = np.matmul(
+                weights[0], self._pca_map_T, out=None if out is None else out_view[0]
+            )
+        else:
+            map_out = np.matmul(weights, self._pca_map_T, out=out_view)
 
         if self.include_cmb:
             map_out += T_CMB
 
-        if map_out.shape[0] == 1:
-            map_out = map_out[0]
+        if out is not None:
+            map_out = out
         self.generated_map_data = map_out
         self.generated_map_freqs = freqs
 
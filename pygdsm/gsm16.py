@@ -1,12 +1,11 @@
 import healpy as hp
 import numpy as np
 from astropy import units
-from astropy.utils.data import download_file
 from scipy.interpolate import interp1d, pchip
 
 from .base_observer import BaseObserver
 from .base_skymodel import BaseSkyModel
-from .component_data import GSM2016_DATA_URL
+from .component_data import GSM2016_DATA_URL, get_data_filepath
 
 kB = 1.38065e-23
 C = 2.99792e8
@@ -16,8 +15,9 @@ hoverk = h / kB
 
 
 def K_CMB2MJysr(K_CMB, nu):  # in Kelvin and Hz
-    B_nu = 2 * (h * nu) * (nu / C) ** 2 / (np.exp(hoverk * nu / T) - 1)
-    conversion_factor = (B_nu * C / nu / T) ** 2 / 2 * np.exp(hoverk * nu / T) / kB
+    x = hoverk * nu / T
+    B_nu = 2 * (h * nu) * (nu / C) ** 2 / np.expm1(x)
+    conversion_factor = (B_nu * C / nu / T) ** 2 / 2 * np.exp(x) / kB
     return K_CMB * conversion_factor * 1e20  # 1e-26 for Jy and 1e6 for MJy
 
 
@@ -27,16 +27,21 @@ def K_RJ2MJysr(K_RJ, nu):  # in Kelvin and Hz
 
 
 def rotate_map(hmap, rot_theta, rot_phi, nest=True):
-    nside = hp.npix2nside(len(hmap))
+    # hmap may be a single map or a (n_map, Npix) stack, which share the coordinate work
+    nside = hp.npix2nside(np.shape(hmap)[-1])
 
-    # Get theta, phi for non-rotated map
-    t, p = hp.pix2ang(nside, np.arange(hp.nside2npix(nside)), nest=nest)  # theta, phi
+    # Get unit vectors for non-rotated map
+    vec = np.array(hp.pix2vec(nside, np.arange(hp.nside2npix(nside)), nest=nest))
 
     # Define a rotator
     r = hp.Rotator(deg=False, rot=[rot_phi, rot_theta])
 
-    # Get theta, phi under rotated co-ordinates
-    trot, prot = r(t, p)
+    # Get theta, phi under rotated co-ordinates, applying the rotation matrix
+    # to all pixel vectors with a single matrix product. Angles are computed
+    # straight from the rows of the rotated vectors, without a transposed copy.
+    vec = r.mat @ vec
+    trot = np.arccos(np.clip(vec[2], -1.0, 1.0, out=vec[2]))
+    prot = np.arctan2(vec[1], vec[0])
 
     # Inerpolate map onto these co-ordinates
     rot_map = hp.get_interp_val(hmap, trot, prot, nest=nest)
@@ -91,11 +96,7 @@ class GlobalSkyModel16(BaseSkyModel):
         """
 
         # download component data as needed using astropy cache
-        GSM2016_FILEPATH = download_file(
-            GSM2016_DATA_URL,
-            cache=True,
-            show_progress=True,
-        )
+        GSM2016_FILEPATH = get_data_filepath(GSM2016_DATA_URL)
 
         if data_unit not in ["MJysr", "TCMB", "TRJ"]:
             raise RuntimeError(
@@ -126,24 +127,76 @@ class GlobalSkyModel16(BaseSkyModel):
 
         if resolution == "hi":
             self.nside = 1024
-            self.map_ni = np.array([self.h5["highres_%s_map" % lb][:] for lb in labels])
+            map_keys = tuple("highres_%s_map" % lb for lb in labels)
         else:
             self.nside = 64
-            self.map_ni = np.array(self.h5["lowres_maps"])
+            map_keys = ("lowres_maps",)
+
+        # Maps are stored in NESTED order. Reorder them to RING once, so that
+        # generate() output needs no reordering. The reordered maps are shared
+        # with other instances, like data read directly from the file.
+        def load_ring_maps():
+            ring2nest = hp.ring2nest(self.nside, np.arange(hp.nside2npix(self.nside)))
+            return self._read_h5(*map_keys, dtype=self._dtype)[:, ring2nest]
 
-        self.spec_nf = self.h5["spectra"][:]
+        self.map_ni = self._cached(
+            (str(self.filepath), map_keys, np.dtype(self._dtype), "RING"), load_ring_maps
+        )
+
+        self.spec_nf = self._read_h5("spectra")
+        self.h5.close()
 
         if theta_rot or phi_rot:
-            for i, map in enumerate(self.map_ni):
-                self.map_ni[i] = rotate_map(map, theta_rot, phi_rot, nest=True)
+            # map_ni is shared with other instances, so rotate into a new array
+            self.map_ni = np.ascontiguousarray(
+                rotate_map(self.map_ni, theta_rot, phi_rot, nest=False), dtype=self._dtype
+            )
+
+        self.interp_comps = None
+        self.update_interpolants()
+
+    def update_interpolants(self):
+        # Pre-compute interpolation functions, borrowing code from the original GSM2008 model
+        pca_freqs_ghz = self.spec_nf[0]
+        pca_scaling = self.spec_nf[1]
+        pca_comps = self.spec_nf[2:].T
+        ln_pca_freqs = np.log(pca_freqs_ghz)
+        if self.interpolation_method == "cubic":
+            spl_scaling = interp1d(ln_pca_freqs, np.log(pca_scaling), kind="cubic")
+            spl_comps = interp1d(ln_pca_freqs, pca_comps, kind="cubic", axis=0)
+        else:
+            spl_scaling = pchip(ln_pca_freqs, np.log(pca_scaling))
+            spl_comps = pchip(ln_pca_freqs, pca_comps, axis=0)
+        self.interp_comps = (spl_scaling, spl_comps)
+
+    def _eval_weights(self, ln_freqs):
+        """Evaluate PCA component weights at given frequencies.
+
+        Parameters
+        ----------
+        ln_freqs: np.array
+            Natural log of frequencies, in GHz
+
+        Returns
+        -------
+        weights: np.array
+            Component weights with overall scaling applied, shape (n_freq, n_comp)
+        """
+        spl_scaling, spl_comps = self.interp_comps
+        comps = spl_comps(ln_freqs)
+        scaling = np.exp(spl_scaling(ln_freqs))
+        return comps * scaling[:, None]
 
-    def generate(self, freqs):
+    def generate(self, freqs, out=None):
         """Generate a global sky model at a given frequency or frequencies
 
         Parameters
         ----------
         freqs: float or np.array
             Frequency for which to return GSM model
+        out: np.array (optional)
+            Array to write output into, instead of allocating a new one. Must
+            have the shape and dtype (float32) of the returned map(s).
 
         Returns
         -------
@@ -154,88 +207,43 @@ class GlobalSkyModel16(BaseSkyModel):
         """
 
         # convert frequency values into Hz
+        freqs_ghz = self._to_mhz(freqs) / 1e3
         freqs = np.array(freqs) * units.Unit(self.freq_unit)
-        freqs_ghz = freqs.to("GHz").value
-
-        if isinstance(freqs_ghz, float):
-            freqs_ghz = np.array([freqs_ghz])
 
-        try:
-            assert np.min(freqs_ghz) >= 0.01
-            assert np.max(freqs_ghz) <= 5000
-        except AssertionError:
+        if not (np.min(freqs_ghz) >= 0.01 and np.max(freqs_ghz) <= 5000):
             raise RuntimeError("Frequency values lie outside 10 MHz < f < 5 THz: %s")
 
-        map_ni = self.map_ni
-        # if self.resolution == 'hi':
-        #     map_ni = self.map_ni_hr
-        # else:
-        #     map_ni = self.map_ni_lr
-
-        spec_nf = self.spec_nf
-        nfreq = spec_nf.shape[1]
-
-        # Now borrow code from the orignal GSM2008 model to do a sensible interpolation
-
-        pca_freqs_ghz = spec_nf[0]
-        pca_scaling = spec_nf[1]
-        pca_comps = spec_nf[2:]
-        # Interpolate to the desired frequency values
-        ln_pca_freqs = np.log(pca_freqs_ghz)
-        if self.interpolation_method == "cubic":
-            spl_scaling = interp1d(ln_pca_freqs, np.log(pca_scaling), kind="cubic")
-            spl1 = interp1d(ln_pca_freqs, pca_comps[0], kind="cubic")
-            spl2 = interp1d(ln_pca_freqs, pca_comps[1], kind="cubic")
-            spl3 = interp1d(ln_pca_freqs, pca_comps[2], kind="cubic")
-            spl4 = interp1d(ln_pca_freqs, pca_comps[3], kind="cubic")
-            spl5 = interp1d(ln_pca_freqs, pca_comps[4], kind="cubic")
-            spl6 = interp1d(ln_pca_freqs, pca_comps[5], kind="cubic")
-
+        # Per-frequency unit conversion factors
+        freqs_hz = 1e9 * freqs_ghz
+        k_cmb = K_CMB2MJysr(1.0, freqs_hz)
+        if self.data_unit == "TCMB":
+            conversion = 1.0 / k_cmb
+        elif self.data_unit == "TRJ":
+            conversion = 1.0 / K_RJ2MJysr(1.0, freqs_hz)
         else:
-            spl_scaling = pchip(ln_pca_freqs, np.log(pca_scaling))
-            spl1 = pchip(ln_pca_freqs, pca_comps[0])
-            spl2 = pchip(ln_pca_freqs, pca_comps[1])
-            spl3 = pchip(ln_pca_freqs, pca_comps[2])
-            spl4 = pchip(ln_pca_freqs, pca_comps[3])
-            spl5 = pchip(ln_pca_freqs, pca_comps[4])
-            spl6 = pchip(ln_pca_freqs, pca_comps[5])
-
-        self.interp_comps = (spl_scaling, spl1, spl2, spl3, spl4, spl5, spl6)
-
-        ln_freqs = np.log(freqs_ghz)
-        comps = np.row_stack((
-            spl1(ln_freqs),
-            spl2(ln_freqs),
-            spl3(ln_freqs),
-            spl4(ln_freqs),
-            spl5(ln_freqs),
-            spl6(ln_freqs),
-        ))
-        scaling = np.exp(spl_scaling(ln_freqs))
-
-        # Finally, compute the dot product via einsum (awesome function)
-        # c=comp, f=freq, p=pixel. We want to dot product over c for each freq
-        # print comps.shape, self.pca_map_data.shape, scaling.shape
-
-        output = np.single(np.einsum("cf,pc,f->fp", comps, map_ni.T, scaling))
-
-        for ifreq, freq in enumerate(freqs_ghz):
-            output[ifreq] = hp.pixelfunc.reorder(output[ifreq], n2r=True)
-
-            # DCP 2024.03.29 - Add CMB if requested
-            if self.include_cmb:
-                output[ifreq] += K_CMB2MJysr(T, 1e9 * freq)
+            conversion = np.ones_like(freqs_hz)
+
+        # Interpolate component weights, then sum components for each freq
+        # with a single (freq, comp) x (comp, pixel) matrix product. The unit
+        # conversion is folded into the weights, so the product is the only
+        # arithmetic pass over the full maps.
+        weights = (self._eval_weights(np.log(freqs_ghz)) * conversion[:, None]).astype(self._dtype)
+        out_view = self._out_view(out, len(weights))
+        cmb_offset = T * k_cmb * conversion
+        if len(weights) == 1:
+            # Single frequency: a matrix-vector product gives the 1-D map directly
+            output = np.matmul(weights[0], self.map_ni, out=None if out is None else out_view[0])
+            cmb_offset = cmb_offset[0]
+        else:
+            output = np.matmul(weights, self.map_ni, out=out_view)
+            cmb_offset = cmb_offset[:, None]
 
-            if self.data_unit == "TCMB":
-                conversion = 1.0 / K_CMB2MJysr(1.0, 1e9 * freq)
-            elif self.data_unit == "TRJ":
-                conversion = 1.0 / K_RJ2MJysr(1.0, 1e9 * freq)
-            else:
-                conversion = 1.0
-            output[ifreq] *= conversion
+        # DCP 2024.03.29 - Add CMB if requested
+        if self.include_cmb:
+            output += cmb_offset
 
-        if len(output) == 1:
-            output = output[0]
+        if out is not None:
+            output = out
         # else:
         #    map_data = np.row_stack(output)
 
@@ -244,6 +252,19 @@ class GlobalSkyModel16(BaseSkyModel):
 
         return output
 
+    def set_freq_unit(self, new_unit):
+        freqs = self.generated_map_freqs
+        self.freq_unit = new_unit
+        if freqs is not None:
+            # Regenerate at the same frequencies, expressed in the new unit
+            self.generate(freqs.to(new_unit).value)
+
+    def set_interpolation_method(self, new_method):
+        self.interpolation_method = new_method
+        self.update_interpolants()
+        if self.generated_map_freqs is not None:
+            self.generate(self.generated_map_freqs)
+
 
 class GSMObserver16(BaseObserver):
     def __init__(self):
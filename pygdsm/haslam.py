@@ -1,11 +1,10 @@
 import healpy as hp
 import numpy as np
 from astropy import units
-from astropy.utils.data import download_file
 
 from .base_observer import BaseObserver
 from .base_skymodel import BaseSkyModel
-from .component_data import HASLAM_DATA_URL
+from .component_data import HASLAM_DATA_URL, get_data_filepath
 
 T_CMB = 2.725
 
@@ -52,28 +51,29 @@ class HaslamSkyModel(BaseSkyModel):
         basemap = "Haslam"
 
         # download component data as needed using astropy cache
-        HASLAM_FILEPATH = download_file(
-            HASLAM_DATA_URL,
-            cache=True,
-            show_progress=True,
-        )
+        HASLAM_FILEPATH = get_data_filepath(HASLAM_DATA_URL)
 
         super(HaslamSkyModel, self).__init__(
             "Haslam", HASLAM_FILEPATH, freq_unit, data_unit, basemap
         )
         self.spectral_index = spectral_index
-        self.data = hp.read_map(self.fits, dtype=np.float64) - T_CMB
+        self.data = hp.read_map(self.fits, dtype=self._dtype)
+        self.data -= T_CMB
+        self.fits.close()
         self.nside = 512
 
         self.include_cmb = include_cmb
 
-    def generate(self, freqs):
+    def generate(self, freqs, out=None):
         """Generate a global sky model at a given frequency or frequencies
 
         Parameters
         ----------
         freqs: float or np.array
             Frequency for which to return GSM model
+        out: np.array (optional)
+            Array to write output into, instead of allocating a new one. Must
+            have the shape and dtype (float32) of the returned map(s).
 
         Returns
         -------
@@ -83,18 +83,23 @@ class HaslamSkyModel(BaseSkyModel):
 
         """
         # convert frequency values into Hz
+        freqs_mhz = self._to_mhz(freqs)
         freqs = np.array(freqs) * units.Unit(self.freq_unit)
-        freqs_mhz = freqs.to("MHz").value
-
-        if isinstance(freqs_mhz, float):
-            freqs_mhz = np.array([freqs_mhz])
 
-        map_out = np.outer(
-            (freqs_mhz / 408.0) ** (self.spectral_index), self.data
-        ).squeeze()
+        # One pow per frequency, then a single multiply at output precision,
+        # with no (n_freq, Npix) float64 intermediate
+        scale = ((freqs_mhz / 408.0) ** self.spectral_index).astype(self._dtype)
+        out_view = self._out_view(out, scale.size)
+        if scale.size == 1:
+            map_out = np.multiply(self.data, scale[0], out=None if out is None else out_view[0])
+        else:
+            map_out = np.multiply.outer(scale, self.data, out=out_view)
 
         if self.include_cmb:
             map_out += T_CMB
+
+        if out is not None:
+            map_out = out
         self.generated_map_data = map_out
         self.generated_map_freqs = freqs
         return map_out
@@ -1,24 +1,31 @@
 import healpy as hp
 import numpy as np
 from astropy import units
-from astropy.utils.data import download_file
-from scipy.interpolate import interp1d
+from scipy.interpolate import CubicSpline, PPoly, make_interp_spline
 
 from .base_observer import BaseObserver
 from .base_skymodel import BaseSkyModel
-from .component_data import LFSM_DATA_URL
+from .component_data import LFSM_DATA_URL, get_data_filepath
+from .utils import pix2ang_cached
 
 T_CMB = 2.725
 
 
+def equatorial_to_galactic_angles(nside):
+    """
+    Return the equatorial (theta, phi) that each Galactic pixel samples.
+    """
+    rotCG = hp.rotator.Rotator(coord=("C", "G"))
+    theta, phi = pix2ang_cached(nside)
+    return rotCG(theta, phi, inv=True)
+
+
 def rotate_equatorial_to_galactic(map):
     """
     Given a map in equatorial coordinates, convert it to Galactic coordinates.
     """
-    rotCG = hp.rotator.Rotator(coord=("C", "G"))
     nSides = hp.pixelfunc.npix2nside(map.size)
-    theta, phi = hp.pixelfunc.pix2ang(nSides, range(map.size))
-    theta_new, phi_new = rotCG(theta, phi, inv=True)
+    theta_new, phi_new = equatorial_to_galactic_angles(nSides)
     map2 = hp.get_interp_val(map, theta_new, phi_new)
     return map2
 
@@ -39,18 +46,15 @@ class LowFrequencySkyModel(BaseSkyModel):
         basemap = "LFSS"
 
         # download component data as needed using astropy cache
-        LFSM_FILEPATH = download_file(
-            LFSM_DATA_URL,
-            cache=True,
-            show_progress=True,
-        )
+        LFSM_FILEPATH = get_data_filepath(LFSM_DATA_URL)
 
         super(LowFrequencySkyModel, self).__init__(
             "LFSM", LFSM_FILEPATH, freq_unit, data_unit, basemap
         )
 
-        self.pca_map = self.h5["lfsm_component_maps_3.0deg.dat"][:]
-        self.pca_components = self.h5["lfsm_components.dat"][:]
+        self.pca_map = self._read_h5("lfsm_component_maps_3.0deg.dat")
+        self.pca_components = self._read_h5("lfsm_components.dat")
+        self.h5.close()
         self.nside = 256
 
         self.include_cmb = include_cmb
@@ -59,19 +63,45 @@ class LowFrequencySkyModel(BaseSkyModel):
         sigmas = self.pca_components[:, 1]
         comps = self.pca_components[:, 2:]
 
-        self.scaleFunc = interp1d(np.log(freqs), np.log(sigmas), kind="slinear")
+        # Linear spline for scaling, and one (not-a-knot) cubic spline for all components,
+        # evaluating to (n_freq, n_comp). Same as interp1d 'slinear' and 'cubic'.
+        self.scaleFunc = make_interp_spline(np.log(freqs), np.log(sigmas), k=1)
+        self.compFunc = CubicSpline(np.log(freqs), comps, axis=0)
+
+        # Rotation from equatorial to Galactic is linear and does not depend on
+        # frequency, so the component maps are rotated once here rather than every
+        # output map. Bilinear interpolation weights are those of get_interp_val.
+        # The rotated maps are shared with other instances, like data read from the file.
+        def load_pca_map_gal_T():
+            rot_idx, rot_wgt = hp.get_interp_weights(
+                self.nside, *equatorial_to_galactic_angles(self.nside)
+            )
+            return np.einsum("kp,kpc->cp", rot_wgt, self.pca_map[rot_idx]).astype(self._dtype)
+
+        self._pca_map_gal_T = self._cached(
+            (str(self.filepath), ("lfsm_component_maps_3.0deg.dat",), np.dtype(self._dtype), "GAL"),
+            load_pca_map_gal_T,
+        )
 
-        self.compFuncs = []
-        for i in range(comps.shape[1]):
-            self.compFuncs.append(interp1d(np.log(freqs), comps[:, i], kind="cubic"))
+    @property
+    def compFuncs(self):
+        """Per-component interpolators, equivalent to the columns of compFunc.
 
-    def generate(self, freqs):
+        Kept for compatibility: earlier versions stored a list of interp1d objects here.
+        """
+        x = self.compFunc.x
+        return [PPoly.construct_fast(self.compFunc.c[..., i], x) for i in range(self.compFunc.c.shape[-1])]
+
+    def generate(self, freqs, out=None):
         """Generate a global sky model at a given frequency or frequencies
 
         Parameters
         ----------
         freqs: float or np.array
             Frequency for which to return GSM model
+        out: np.array (optional)
+            Array to write output into, instead of allocating a new one. Must
+            have the shape and dtype (float32) of the returned map(s).
 
         Returns
         -------
@@ -81,39 +111,31 @@ class LowFrequencySkyModel(BaseSkyModel):
 
         """
         # convert frequency values into Hz
+        freqs_mhz = self._to_mhz(freqs)
         freqs = np.array(freqs) * units.Unit(self.freq_unit)
-        freqs_mhz = freqs.to("MHz").value
 
-        if isinstance(freqs_mhz, float):
-            freqs_mhz = np.array([freqs_mhz])
-
-        try:
-            assert np.min(freqs_mhz) >= 10
-            assert np.max(freqs_mhz) <= 408
-        except AssertionError:
+        if not (np.min(freqs_mhz) >= 10 and np.max(freqs_mhz) <= 408):
             raise RuntimeError("Frequency values lie outside 10 MHz < f < 408 MHz")
 
-        map_out = 0.0
-        if isinstance(freqs, np.ndarray):
-            if freqs.ndim > 0:
-                map_out = np.zeros(shape=(freqs.shape[0], hp.nside2npix(self.nside)))
-            else:
-                map_out = np.zeros(shape=(1, hp.nside2npix(self.nside)))
+        # Evaluate component weights at all frequencies, then sum (Galactic) components
+        # for every frequency with a single (freq, comp) x (comp, pixel) matrix product
+        ln_freqs = np.log(freqs_mhz)
+        weights = self.compFunc(ln_freqs) * np.exp(self.scaleFunc(ln_freqs))[:, None]
+        weights = weights.astype(self._dtype)
+        out_view = self._out_view(out, len(weights))
+        if len(weights) == 1:
+            map_out = np.matmul(
+                weights[0], self._pca_map_gal_T, out=None if out is None else out_view[0]
+            )
         else:
-            map_out = np.zeros(shape=(1, hp.nside2npix(self.nside)))
-
-        for ff in range(map_out.shape[0]):
-            for i, compFunc in enumerate(self.compFuncs):
-                map_out[ff] += compFunc(np.log(freqs_mhz[ff])) * self.pca_map[:, i]
-            map_out[ff] *= np.exp(self.scaleFunc(np.log(freqs_mhz[ff])))
-
-            map_out[ff] = rotate_equatorial_to_galactic(map_out[ff])
-
-        map_out = map_out.squeeze()
+            map_out = np.matmul(weights, self._pca_map_gal_T, out=out_view)
 
         if self.include_cmb == False:
             map_out -= T_CMB
 
+        if out is not None:
+            map_out = out
+
         self.generated_map_data = map_out
         self.generated_map_freqs = freqs
         return map_out
@@ -1,6 +1,31 @@
+import weakref
+
 import healpy as hp
 import numpy as np
-from astropy.coordinates import SkyCoord
+from astropy.coordinates import Galactic, SkyCoord
+
+# Pixel angle grids, keyed by (nside, nest). Entries are dropped once no caller holds them.
+_PIX_ANG_CACHE = weakref.WeakValueDictionary()
+
+
+def pix2ang_cached(nside: int, nest: bool = False) -> np.ndarray:
+    """Get theta, phi for every pixel of a healpix map, reusing previous results
+
+    Args:
+        nside (int): Healpix NSIDE parameter
+        nest (bool): Use NESTED pixel ordering (default RING)
+
+    Returns:
+        theta_phi (np.array): Read-only (2, Npix) array of colatitude and longitude,
+                              in radians. Shared between callers while any hold it.
+    """
+    key = (nside, nest)
+    theta_phi = _PIX_ANG_CACHE.get(key)
+    if theta_phi is None:
+        theta_phi = np.array(hp.pix2ang(nside, np.arange(hp.nside2npix(nside)), nest=nest))
+        theta_phi.flags.writeable = False
+        _PIX_ANG_CACHE[key] = theta_phi
+    return theta_phi
 
 
 def hpix2sky(nside: int, pix_ids: np.ndarray) -> SkyCoord:
@@ -13,11 +38,26 @@ def hpix2sky(nside: int, pix_ids: np.ndarray) -> SkyCoord:
     Returns:
         sc (SkyCoord): Corresponding SkyCoordinates
     """
-    gl, gb = hp.pix2ang(nside, pix_ids, lonlat=True)
+    gl, gb = hpix2sky_fast(nside, pix_ids)
     sc = SkyCoord(gl, gb, frame="galactic", unit=("deg", "deg"))
     return sc
 
 
+def hpix2sky_fast(nside: int, pix_ids: np.ndarray) -> tuple:
+    """Convert a healpix pixel_id into Galactic longitude and latitude arrays
+
+    Faster alternative to hpix2sky() for bulk conversions, as no SkyCoord is created.
+
+    Args:
+        nside (int): Healpix NSIDE parameter
+        pix_ids (np.array): Array of pixel IDs
+
+    Returns:
+        gl, gb (np.array, np.array): Galactic longitude and latitude, in degrees
+    """
+    return hp.pix2ang(nside, pix_ids, lonlat=True)
+
+
 def sky2hpix(nside: int, sc: SkyCoord) -> np.ndarray:
     """Convert a SkyCoord into a healpix pixel_id
 
@@ -28,6 +68,8 @@ def sky2hpix(nside: int, sc: SkyCoord) -> np.ndarray:
     Returns:
         pix (np.array): Array of healpix pixel IDs
     """
-    gl, gb = sc.galactic.l.to("deg").value, sc.galactic.b.to("deg").value
+    # Transform to galactic only if needed, and only once
+    gal = sc if isinstance(sc.frame, Galactic) else sc.galactic
+    gl, gb = gal.l.to("deg").value, gal.b.to("deg").value
     pix = hp.ang2pix(nside, gl, gb, lonlat=True)
     return pix
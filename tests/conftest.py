@@ -0,0 +1,55 @@
+"""
+conftest.py
+===========
+
+Shared fixtures for the pygdsm tests. Sky models are slow to construct, so
+each configuration is built once per session and reused.
+"""
+
+import functools
+
+import matplotlib
+
+# Use the non-interactive Agg backend, so plotting never opens a window or blocks
+matplotlib.use("Agg", force=True)
+import matplotlib.pyplot as plt  # noqa: E402
+import pytest  # noqa: E402
+
+from pygdsm import GSMObserver, GSMObserver16, LFSMObserver  # noqa: E402
+
+plt.show = lambda *args, **kwargs: None
+
+
+@pytest.fixture(autouse=True)
+def _close_figs():
+    """Close all figures after each test, so they don't accumulate"""
+    yield
+    plt.close("all")
+
+
+@pytest.fixture(scope="session")
+def sky_model():
+    """Factory for sky models, cached on (SkyModel class, constructor kwargs)."""
+
+    @functools.lru_cache(maxsize=None)
+    def _sky_model(sky_model_cls, **kwargs):
+        return sky_model_cls(**kwargs)
+
+    return _sky_model
+
+
+# Observers carry location, date and horizon state, so each test gets a new one.
+# Construction is cheap, as the sky model map arrays are shared between instances.
+@pytest.fixture
+def gsm_observer():
+    return GSMObserver()
+
+
+@pytest.fixture
+def gsm16_observer():
+    return GSMObserver16()
+
+
+@pytest.fixture
+def lfsm_observer():
+    return LFSMObserver()
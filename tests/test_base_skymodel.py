@@ -7,10 +7,12 @@ Tests for GSM base skymodel
 
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from astropy.utils.data import download_file
 
+from pygdsm import GlobalSkyModel, GlobalSkyModel16, HaslamSkyModel, LowFrequencySkyModel
 from pygdsm.base_skymodel import BaseSkyModel
 from pygdsm.component_data import GSM_DATA_URL
 
@@ -45,5 +47,57 @@ def test_base_skymodel_init():
         )
 
 
+def test_read_h5_cache():
+    gsm_a = BaseSkyModel(
+        "TEST_GSM", GSM_FILEPATH, freq_unit="MHz", basemap="haslam", data_unit="K"
+    )
+    gsm_b = BaseSkyModel(
+        "TEST_GSM", GSM_FILEPATH, freq_unit="MHz", basemap="haslam", data_unit="K"
+    )
+    d = gsm_a._read_h5("components")
+    assert gsm_b._read_h5("components") is d
+    assert not d.flags.writeable
+
+    # Cached data can still be read once the file is closed
+    del d
+    gsm_a.h5.close()
+    assert isinstance(gsm_a._read_h5("components"), np.ndarray)
+
+
+def test_model_maps_shared():
+    """Derived (transposed/rotated) component maps are shared between instances"""
+    assert GlobalSkyModel()._pca_map_T is GlobalSkyModel()._pca_map_T
+    assert LowFrequencySkyModel()._pca_map_gal_T is LowFrequencySkyModel()._pca_map_gal_T
+
+
+@pytest.mark.parametrize(
+    "sky_model_cls, kwargs, freqs",
+    [
+        (GlobalSkyModel, dict(freq_unit="MHz"), [50, 100]),
+        (GlobalSkyModel16, dict(freq_unit="MHz", resolution="lo"), [50, 100]),
+        (HaslamSkyModel, dict(freq_unit="MHz"), [100, 200]),
+        (LowFrequencySkyModel, dict(freq_unit="MHz"), [50, 100]),
+    ],
+)
+def test_generate_out(sky_model, sky_model_cls, kwargs, freqs):
+    g = sky_model(sky_model_cls, **kwargs)
+    d = g.generate(freqs)
+
+    out = np.empty(d.shape, dtype="float32")
+    assert g.generate(freqs, out=out) is out
+    assert np.array_equal(out, d)
+
+    # Single frequency writes into a 1D array. This may use a different BLAS
+    # routine than the multi-frequency path, so compare to within rounding.
+    out_1d = np.empty(d.shape[1], dtype="float32")
+    assert g.generate(freqs[0], out=out_1d) is out_1d
+    assert np.allclose(out_1d, d[0])
+
+    with pytest.raises(ValueError):
+        g.generate(freqs, out=out_1d)
+
+
 if __name__ == "__main__":
     test_base_skymodel_init()
+    test_read_h5_cache()
+    test_model_maps_shared()
@@ -116,11 +116,23 @@ def test_write_fits():
     os.remove("test_write_fits.fits")
 
 
-def test_cmb_removal():
-    g = GlobalSkyModel(freq_unit="MHz", include_cmb=False)
-    sky_no_cmb = g.generate(400)
-    g = GlobalSkyModel(freq_unit="MHz", include_cmb=True)
-    sky_with_cmb = g.generate(400)
+def test_write_hdf5():
+    gsm = GlobalSkyModel()
+    gsm.generate([1000, 2000])
+    gsm.write_fits("test_write_hdf5.h5")
+
+    with h5py.File("test_write_hdf5.h5", "r") as h5:
+        d_h5 = h5["map"][:]
+        assert h5["map"].attrs["units"] == gsm.data_unit
+
+    assert np.array_equal(d_h5, gsm.generated_map_data)
+
+    os.remove("test_write_hdf5.h5")
+
+
+def test_cmb_removal(sky_model):
+    sky_no_cmb = sky_model(GlobalSkyModel, freq_unit="MHz", include_cmb=False).generate(400)
+    sky_with_cmb = sky_model(GlobalSkyModel, freq_unit="MHz", include_cmb=True).generate(400)
 
     T_cmb = (sky_with_cmb - sky_no_cmb).mean()
     print(T_cmb)
@@ -137,6 +149,23 @@ def test_get_sky_temperature():
     assert np.allclose(T, T_gold)
 
 
+def test_get_sky_temperature_reuse():
+    gc = SkyCoord(0, 0, unit="deg", frame="galactic")
+    freqs = (50, 100, 150)
+    g = GlobalSkyModel()
+    T = g.get_sky_temperature(gc, freqs)
+
+    # Frame does not change result
+    assert np.allclose(g.get_sky_temperature(gc.icrs, freqs), T)
+
+    # Same frequencies, but model settings changed, so result must change too
+    g.include_cmb = True
+    assert np.allclose(g.get_sky_temperature(gc, freqs), T + 2.725)
+
+    g.get_sky_temperature(gc, (50, 100))
+    assert g.generated_map_data.shape[0] == 2
+
+
 def test_stupid_values():
     with pytest.raises(RuntimeError):
         g = GlobalSkyModel(basemap="haslamalan")
@@ -155,12 +184,18 @@ def test_set_interpolation_method():
 
 
 if __name__ == "__main__":
+    # Outside pytest, sky models are built directly rather than by the sky_model fixture
+    def sky_model(sky_model_cls, **kwargs):
+        return sky_model_cls(**kwargs)
+
     test_stupid_values()
     test_set_interpolation_method()
     test_gsm_generate()
     test_compare_to_gsm()
     test_speed()
     test_write_fits()
+    test_write_hdf5()
     test_set_methods()
-    test_cmb_removal()
+    test_cmb_removal(sky_model)
     test_get_sky_temperature()
+    test_get_sky_temperature_reuse()
@@ -1,7 +1,3 @@
-import sys
-
-sys.path.append("/workdata/pygdsm")
-
 from datetime import datetime
 
 import healpy as hp
@@ -12,8 +8,8 @@ import pytest
 from pygdsm import GlobalSkyModel, GlobalSkyModel16, GSMObserver, GSMObserver16
 
 
-def test_compare_gsm_to_old():
-    g = GlobalSkyModel16(freq_unit="GHz", resolution="hi", data_unit="TCMB")
+def test_compare_gsm_to_old(sky_model):
+    g = sky_model(GlobalSkyModel16, freq_unit="GHz", resolution="hi", data_unit="TCMB")
     d = g.generate(0.408)
     g.view()
 
@@ -22,10 +18,10 @@ def test_compare_gsm_to_old():
     g_old.view()
 
 
-def test_observer_test():
+def test_observer_test(gsm16_observer, gsm_observer):
     # Setup observatory location - in this case, Parkes Australia
     (latitude, longitude, elevation) = ("-32.998370", "148.263659", 100)
-    ov = GSMObserver16()
+    ov = gsm16_observer
     ov.lon = longitude
     ov.lat = latitude
     ov.elev = elevation
@@ -34,7 +30,7 @@ def test_observer_test():
     ov.generate(1400)
     d = ov.view(logged=True)
 
-    ov = GSMObserver()
+    ov = gsm_observer
     ov.lon = longitude
     ov.lat = latitude
     ov.elev = elevation
@@ -44,83 +40,108 @@ def test_observer_test():
     d = ov.view(logged=True)
     plt.show()
 
-    ov = GSMObserver16()
-    ov.lon = longitude
-    ov.lat = latitude
-    ov.elev = elevation
-    ov.date = datetime(2000, 1, 1, 23, 0)
-
+    ov = gsm16_observer
     horizon_elevation = 85.0
     ov.generate(1400, horizon_elevation=str(horizon_elevation))
     d_85deg_horizon = ov.view(logged=True)
 
-    ov = GSMObserver16()
-    ov.lon = longitude
-    ov.lat = latitude
-    ov.elev = elevation
-    ov.date = datetime(2000, 1, 1, 23, 0)
-
     ov.generate(1400, horizon_elevation=np.deg2rad(horizon_elevation))
     d_85deg2rad_horizon = ov.view(logged=True)
 
-    assert np.all(d_85deg_horizon == d_85deg2rad_horizon), "The two methods for calculating the artificial horizon do not match."
-    assert np.ma.count_masked(d_85deg_horizon).sum() == 12558953
+    a, b = d_85deg_horizon, d_85deg2rad_horizon
+    assert np.array_equal(a.mask, b.mask), "The two methods for calculating the artificial horizon do not match."
+    assert np.array_equal(a.compressed(), b.compressed())
+    assert int(a.mask.sum()) == 12558953
     plt.show()
 
-def test_interp():
-    f = np.arange(40, 80, 5)
-    for interp in ("pchip", "cubic"):
-        for SkyModel in (GlobalSkyModel, GlobalSkyModel16):
-            name = str(SkyModel).strip("<>").split(".")[-1].strip("' ")
-            gsm = SkyModel(freq_unit="MHz", interpolation=interp)
-            d = gsm.generate(f)
-
-            sky_spec = d.mean(axis=1)
-            fit = np.poly1d(np.polyfit(f, sky_spec, 5))(f)
-
-            plt.plot(f, sky_spec - fit, label=f"{name}: {interp}")
-
+def plot_interp_residuals(f, residuals):
+    for label, resid in residuals.items():
+        plt.plot(f, resid, label=label)
     plt.xlabel("Frequency [MHz]")
     plt.ylabel("Residual [K]")
     plt.legend()
     plt.show()
 
 
-def test_gsm_opts():
-    g = GlobalSkyModel16(freq_unit="GHz", resolution="hi", data_unit="TCMB")
-    d = g.generate(0.408)
-    g = GlobalSkyModel16(freq_unit="GHz", resolution="lo", data_unit="MJysr")
-    d = g.generate(0.408)
-    g = GlobalSkyModel16(freq_unit="MHz", resolution="lo", data_unit="TRJ")
-    d = g.generate(408)
+@pytest.fixture(scope="module")
+def interp_freqs():
+    return np.arange(40, 80, 5)
+
+
+@pytest.fixture(scope="module")
+def interp_residuals(interp_freqs):
+    """Collect residuals from each test_interp case, and plot them all at the end"""
+    residuals = {}
+    yield residuals
+    plot_interp_residuals(interp_freqs, residuals)
+
+
+@pytest.mark.parametrize("interp", ["pchip", "cubic"])
+@pytest.mark.parametrize("SkyModel", [GlobalSkyModel, GlobalSkyModel16])
+def test_interp(SkyModel, interp, sky_model, interp_freqs, interp_residuals):
+    f = interp_freqs
+    gsm = sky_model(SkyModel, freq_unit="MHz", interpolation=interp)
+    d = gsm.generate(f)
+
+    sky_spec = d.mean(axis=1)
+    fit = np.poly1d(np.polyfit(f, sky_spec, 5))(f)
 
-    with pytest.raises(RuntimeError):
+    interp_residuals[f"{SkyModel.__name__}: {interp}"] = sky_spec - fit
+
+
+@pytest.mark.parametrize(
+    "opts, f",
+    [
+        (dict(freq_unit="GHz", resolution="hi", data_unit="TCMB"), 0.408),
+        (dict(freq_unit="GHz", resolution="lo", data_unit="MJysr"), 0.408),
+        (dict(freq_unit="MHz", resolution="lo", data_unit="TRJ"), 408),
+    ],
+)
+def test_gsm_opts(opts, f, sky_model):
+    g = sky_model(GlobalSkyModel16, **opts)
+    d = g.generate(f)
+
+
+def test_gsm_out_of_range(sky_model):
+    g = sky_model(GlobalSkyModel16, freq_unit="MHz", resolution="lo", data_unit="TRJ")
+    with pytest.raises(RuntimeError, match="Frequency values lie outside"):
         g.generate(5e12)
 
-    with pytest.raises(RuntimeError):
-        g = GlobalSkyModel16(resolution="oh_hai")
 
-    with pytest.raises(RuntimeError):
-        g = GlobalSkyModel16(data_unit="furlongs/fortnight")
+def test_gsm_bad_opts():
+    with pytest.raises(RuntimeError, match="RESOLUTION ERROR"):
+        GlobalSkyModel16(resolution="oh_hai")
 
+    with pytest.raises(RuntimeError, match="UNIT ERROR"):
+        GlobalSkyModel16(data_unit="furlongs/fortnight")
 
-def test_cmb_removal():
-    g = GlobalSkyModel16(
-        freq_unit="GHz", resolution="lo", data_unit="TCMB", include_cmb=False
-    )
-    sky_no_cmb = g.generate(400)
-    g = GlobalSkyModel16(
-        freq_unit="GHz", resolution="lo", data_unit="TCMB", include_cmb=True
-    )
-    sky_with_cmb = g.generate(400)
+
+def test_cmb_removal(sky_model):
+    opts = dict(freq_unit="GHz", resolution="lo", data_unit="TCMB")
+    sky_no_cmb = sky_model(GlobalSkyModel16, include_cmb=False, **opts).generate(400)
+    sky_with_cmb = sky_model(GlobalSkyModel16, include_cmb=True, **opts).generate(400)
 
     T_cmb = (sky_with_cmb - sky_no_cmb).mean()
     print(T_cmb)
     assert np.isclose(T_cmb, 2.725)
 
 
+def test_set_methods():
+    g = GlobalSkyModel16(freq_unit="MHz", resolution="lo", interpolation="pchip")
+    d_pchip = g.generate(408)
+    g.set_interpolation_method("cubic")
+    assert g.interpolation_method == "cubic"
+    assert not np.array_equal(g.generated_map_data, d_pchip)
+    d_cubic = g.generated_map_data
+    g.set_freq_unit("GHz")
+    assert g.freq_unit == "GHz"
+    assert np.allclose(g.generated_map_freqs.to("MHz").value, 408)
+    assert np.allclose(g.generated_map_data, d_cubic)
+    d_ghz = g.generate(0.408)
+    assert np.allclose(d_ghz, GlobalSkyModel16(resolution="lo", interpolation="cubic").generate(408))
+
+
 if __name__ == "__main__":
-    test_compare_gsm_to_old()
-    test_observer_test()
-    test_gsm_opts()
-    test_interp()
+    test_observer_test(GSMObserver16(), GSMObserver())
+    test_gsm_bad_opts()
+    test_set_methods()
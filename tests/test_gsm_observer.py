@@ -1,43 +1,20 @@
-import os
+import io
 from datetime import datetime
+from pathlib import Path
 
 import healpy as hp
 import numpy as np
 import pylab as plt
 from astropy.time import Time
+from PIL import Image
 import pytest
 
 from pygdsm import GSMObserver, GSMObserver16, LFSMObserver
+from pygdsm.utils import pix2ang_cached
 
 
-def test_gsm_observer(show=False):
-    """Test GSMObserver() is working"""
+def _run_observer(ov, show=False):
     (latitude, longitude, elevation) = ("37.2", "-118.2", 1222)
-    ov = GSMObserver()
-    ov.lon = longitude
-    ov.lat = latitude
-    ov.elev = elevation
-    ov.date = datetime(2000, 1, 1, 23, 0)
-    ov.generate(50)
-    ov.view(logged=True)
-    ov.view_observed_gsm(logged=True)
-    if show:
-        plt.show()
-
-    (latitude, longitude, elevation) = ("37.2", "-118.2", 1222)
-    ov = GSMObserver16()
-    ov.lon = longitude
-    ov.lat = latitude
-    ov.elev = elevation
-    ov.date = datetime(2000, 1, 1, 23, 0)
-    ov.generate(50)
-    ov.view(logged=True)
-    ov.view_observed_gsm(logged=True)
-    if show:
-        plt.show()
-
-    (latitude, longitude, elevation) = ("37.2", "-118.2", 1222)
-    ov = LFSMObserver()
     ov.lon = longitude
     ov.lat = latitude
     ov.elev = elevation
@@ -53,7 +30,22 @@ def test_gsm_observer(show=False):
         plt.show()
 
 
-def test_observed_mollview():
+@pytest.mark.parametrize("observer", ["gsm_observer", "gsm16_observer", "lfsm_observer"])
+def test_gsm_observer(observer, request):
+    """Test GSMObserver(), GSMObserver16() and LFSMObserver() are working"""
+    _run_observer(request.getfixturevalue(observer))
+
+
+def save_frame(frames):
+    """Render the current figure to PNG in memory, and append it to a list of GIF frames"""
+    buf = io.BytesIO()
+    plt.savefig(buf, format="png")
+    plt.close()
+    buf.seek(0)
+    frames.append(Image.open(buf).copy())
+
+
+def test_observed_mollview(tmp_path):
     """Generate animated maps of observing coverage over 24 hours"""
 
     (latitude, longitude, elevation) = ("37.2", "-118.2", 1222)
@@ -62,47 +54,41 @@ def test_observed_mollview():
     ov.lat = latitude
     ov.elev = elevation
 
-    obs = []
-    if not os.path.exists('generated_sky'):
-        os.mkdir('generated_sky')
+    frames = {name: [] for name in ("galactic", "ecliptic", "equatorial", "ortho", "ortho_85deg_horizon")}
     freq = 50
-    horizon_elevation = '85.0'
+    # Convert once: pyephem reads floats as radians (a string would be parsed as degrees)
+    horizon_elevation = float(np.deg2rad(85.0))
+
+    # Galactic -> ecliptic/equatorial rotations are time-independent, so precompute
+    # the pixel mapping once and gather, rather than rotating in every mollview call
+    nside = 512
+    theta, phi = pix2ang_cached(nside)
+    pix_GE = hp.ang2pix(nside, *hp.Rotator(coord=["G", "E"]).I(theta, phi))
+    pix_GC = hp.ang2pix(nside, *hp.Rotator(coord=["G", "C"]).I(theta, phi))
+
     for ii in range(0, 24, 4):
         ov.date = datetime(2000, 1, 1, ii, 0)
         ov.generate(freq)
         sky = ov.view_observed_gsm(logged=True, show=False, min=9, max=20)
-        plt.savefig("generated_sky/galactic-%02d.png" % ii)
-        plt.close()
-
-        hp.mollview(sky, coord=["G", "E"], min=9, max=20)
-        plt.savefig("generated_sky/ecliptic-%02d.png" % ii)
-        plt.close()
+        save_frame(frames["galactic"])
 
-        hp.mollview(sky, coord=["G", "C"], min=9, max=20)
-        plt.savefig("generated_sky/equatorial-%02d.png" % ii)
-        plt.close()
+        hp.mollview(sky[pix_GE], min=9, max=20)
+        save_frame(frames["ecliptic"])
 
-        ov.view(logged=True, show=False, min=9, max=20)
-        plt.savefig("generated_sky/ortho-%02d.png" % ii)
-        plt.close()
+        hp.mollview(sky[pix_GC], min=9, max=20)
+        save_frame(frames["equatorial"])
 
-        ov.generate(freq=freq, horizon_elevation=horizon_elevation)
         ov.view(logged=True, show=False, min=9, max=20)
-        plt.savefig('generated_sky/ortho_85deg_horizon-%02d.png' % ii)
-        plt.close()
+        save_frame(frames["ortho"])
 
         ov.generate(freq=freq, horizon_elevation=horizon_elevation)
         ov.view(logged=True, show=False, min=9, max=20)
-        plt.savefig('generated_sky/ortho_85deg_horizon-%02d.png' % ii)
-        plt.close()
+        save_frame(frames["ortho_85deg_horizon"])
         print(ii)
 
-    os.system('convert -delay 20 generated_sky/ortho-*.png ortho.gif')
-    os.system('convert -delay 20 generated_sky/ortho_85deg_horizon-*.png ortho_85deg_horizon.gif')
-    os.system('convert -delay 20 generated_sky/galactic-*.png galactic.gif')
-    os.system('convert -delay 20 generated_sky/ecliptic-*.png ecliptic.gif')
-    os.system('convert -delay 20 generated_sky/equatorial-*.png equatorial.gif')
-
+    # 200 ms per frame, looping forever
+    for name, imgs in frames.items():
+        imgs[0].save(tmp_path / f"{name}.gif", save_all=True, append_images=imgs[1:], duration=200, loop=0)
 
 
 def test_generate_with_and_without_args():
@@ -119,20 +105,102 @@ def test_generate_with_and_without_args():
     ov.date = datetime(2000, 1, 1, 22, 0)
     ov.generate()
 
-    ov.generate(51)
-    ov.generate(52)
-    ov.generate()
+    freqs = np.array([50, 51, 52, 53])
     now = Time(datetime.now())
+    d = ov.generate(obstime=now, freq=freqs)
+    assert d.shape == (len(freqs), 12 * 512**2)
+    d_multi = d.copy()
+    d_53 = ov.generate(obstime=now, freq=53)
+    assert np.array_equal(d_53.mask, d_multi[3].mask)
+    assert np.allclose(d_53.compressed(), d_multi[3].compressed())
     ov.generate(obstime=now)
-    ov.generate(obstime=now)
-    ov.generate(obstime=now, freq=53)
-    ov.generate(obstime=now, freq=52)
-    ov.generate(obstime=now, freq=53, horizon_elevation=0.0)
-    ov.generate(obstime=now, freq=52, horizon_elevation='0.0')
-    ov.generate(obstime=now, freq=53, horizon_elevation=np.deg2rad(85.0))
-    ov.generate(obstime=now, freq=52, horizon_elevation='85.0')
+
+    for horizon_elevation in (0.0, '0.0', np.deg2rad(85.0), '85.0'):
+        d = ov.generate(obstime=now, freq=freqs, horizon_elevation=horizon_elevation)
+        assert d.shape == (len(freqs), 12 * 512**2)
+        assert np.array_equal(d.mask[0], d.mask[-1])
+
+def test_generate_returns_new_array():
+    """Test results from earlier generate() calls are not overwritten"""
+    ov = GSMObserver()
+    ov.date = datetime(2000, 1, 1, 23, 0)
+    a = ov.generate(50)
+    a_data = a.data.copy()
+    b = ov.generate(100)
+    assert a is not b
+    assert np.array_equal(a.data, a_data)
+
+    # Nothing changed: the rotation is reused, but the result is still a new array
+    c = ov.generate(100)
+    c *= 2
+    d = ov.generate(100)
+    assert d is not c
+    assert np.array_equal(d.data, b.data)
+
+    g0 = ov.observed_gsm
+    g1 = ov.observed_gsm
+    assert not np.shares_memory(g0.data, g1.data)
+    assert not np.shares_memory(g0.mask, g1.mask)
+
+
+def test_sky_model_regenerated_directly():
+    """Test generate() picks up maps generated on the observer's sky model directly"""
+    ov = GSMObserver()
+    ov.date = datetime(2000, 1, 1, 23, 0)
+    d50 = ov.generate(50).copy()
+    d100 = ov.generate(100).copy()
+
+    ov.gsm.generate(50)
+    assert np.allclose(ov.generate(), d50)
+    # The observer's frequency follows the sky model, so asking for 100 MHz regenerates
+    assert np.allclose(ov.generate(100), d100)
+
+
+def test_horizon_change():
+    """Test changing only the horizon elevation updates the mask"""
+    (latitude, longitude, elevation) = ("37.2", "-118.2", 1222)
+    ov = GSMObserver()
+    ov.lon = longitude
+    ov.lat = latitude
+    ov.elev = elevation
+    ov.date = datetime(2000, 1, 1, 23, 0)
+
+    n_masked_0deg = ov.generate(50).mask.sum()
+    n_masked_85deg = ov.generate(50, horizon_elevation='85.0').mask.sum()
+    assert n_masked_85deg > n_masked_0deg
+    assert ov.generate(50, horizon_elevation=0.0).mask.sum() == n_masked_0deg
+
+
+def test_rotation_cache():
+    """Test pixel mapping is reused when the zenith repeats"""
+    (latitude, longitude, elevation) = ("37.2", "-118.2", 1222)
+    ov = GSMObserver()
+    ov.lon = longitude
+    ov.lat = latitude
+    ov.elev = elevation
+    ov.date = datetime(2000, 1, 1, 23, 0)
+    d0 = ov.generate(50).copy()
+    pix0 = ov._rot_cache[next(iter(ov._rot_cache))][0]
+
+    ov.generate(obstime=Time(datetime(2000, 1, 1, 12, 0)))
+    ov.generate(obstime=Time(datetime(2000, 1, 1, 23, 0)))
+    assert ov._rot_cache[next(iter(ov._rot_cache))][0] is pix0
+    assert np.array_equal(ov._pix0, pix0)
+    assert len(ov._rot_cache) == 2
+    assert np.array_equal(ov.observed_sky, d0)
+    assert np.array_equal(ov.observed_sky.mask, d0.mask)
+
+    for hour in range(ov._rot_cache_size + 1):
+        ov.generate(obstime=Time(datetime(2000, 1, 2, hour, 0)))
+    assert len(ov._rot_cache) == ov._rot_cache_size
+
 
 if __name__ == "__main__":
-    test_gsm_observer(show=True)
-    test_observed_mollview()
+    for observer_cls in (GSMObserver, GSMObserver16, LFSMObserver):
+        _run_observer(observer_cls(), show=True)
+    test_observed_mollview(Path("."))
     test_generate_with_and_without_args()
+    test_generate_returns_new_array()
+    test_sky_model_regenerated_directly()
+    test_horizon_change()
+    test_rotation_cache()
@@ -5,6 +5,8 @@ test_init.py
 Tests for GSM init commands
 """
 
+import pytest
+
 from pygdsm import (
     GlobalSkyModel,
     GlobalSkyModel08,
@@ -33,6 +35,11 @@ def test_init():
     assert isinstance(init_observer("lfsm"), LFSMObserver)
     assert isinstance(init_observer("haslam"), HaslamObserver)
 
+    with pytest.raises(ValueError):
+        init_gsm("gsm99")
+    with pytest.raises(ValueError):
+        init_observer("gsm99")
+
 
 if __name__ == "__main__":
     test_init()
@@ -1,12 +1,7 @@
-import sys
-
-import numpy as np
-
-sys.path.append("/workdata/pygdsm")
-
 from datetime import datetime
 
 import healpy as hp
+import numpy as np
 import pylab as plt
 
 from pygdsm import (
@@ -19,8 +14,8 @@ from pygdsm import (
 )
 
 
-def test_compare_gsm_to_old():
-    gl = LowFrequencySkyModel(freq_unit="MHz")
+def test_compare_gsm_to_old(sky_model):
+    gl = sky_model(LowFrequencySkyModel, freq_unit="MHz")
     dl = gl.generate(408)
     gl.view()
 
@@ -70,21 +65,41 @@ def test_observer_test():
     ov.generate(200, horizon_elevation=np.deg2rad(horizon_elevation))
     d_85deg2rad_horizon = ov.view(logged=True)
 
-    assert np.all(d_85deg_horizon == d_85deg2rad_horizon), "The two methods for calculating the artificial horizon do not match."
-    assert np.ma.count_masked(d_85deg_horizon).sum() == 784951
+    a, b = d_85deg_horizon, d_85deg2rad_horizon
+    assert np.array_equal(a.mask, b.mask), "The two methods for calculating the artificial horizon do not match."
+    assert np.array_equal(a.compressed(), b.compressed())
+    assert int(a.mask.sum()) == 784951
     plt.show()
 
-def test_cmb_removal():
-    g = LowFrequencySkyModel(freq_unit="MHz", include_cmb=False)
-    sky_no_cmb = g.generate(400)
-    g = LowFrequencySkyModel(freq_unit="MHz", include_cmb=True)
-    sky_with_cmb = g.generate(400)
+def test_cmb_removal(sky_model):
+    sky_no_cmb = sky_model(LowFrequencySkyModel, freq_unit="MHz", include_cmb=False).generate(400)
+    sky_with_cmb = sky_model(LowFrequencySkyModel, freq_unit="MHz", include_cmb=True).generate(400)
 
     T_cmb = (sky_with_cmb - sky_no_cmb).mean()
     print(T_cmb)
     assert np.isclose(T_cmb, 2.725)
 
 
+def test_comp_funcs(sky_model):
+    """Test the per-component compFuncs match the original interp1d interpolation"""
+    from scipy.interpolate import interp1d
+
+    gl = sky_model(LowFrequencySkyModel, freq_unit="MHz")
+    ln_freqs = np.log(gl.pca_components[:, 0])
+    comps = gl.pca_components[:, 2:]
+    x = np.log([15.0, 40.0, 200.0])
+    assert len(gl.compFuncs) == comps.shape[1]
+    for i, compFunc in enumerate(gl.compFuncs):
+        assert np.allclose(compFunc(x), interp1d(ln_freqs, comps[:, i], kind="cubic")(x))
+    assert np.allclose(gl.scaleFunc(x), interp1d(ln_freqs, np.log(gl.pca_components[:, 1]), kind="slinear")(x))
+
+
 if __name__ == "__main__":
-    test_compare_gsm_to_old()
-    # test_observer_test()
+    # Outside pytest, sky models are built directly rather than by the sky_model fixture
+    def sky_model(sky_model_cls, **kwargs):
+        return sky_model_cls(**kwargs)
+
+    test_compare_gsm_to_old(sky_model)
+    test_observer_test()
+    test_cmb_removal(sky_model)
+    test_comp_funcs(sky_model)
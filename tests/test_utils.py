@@ -1,7 +1,7 @@
 import healpy as hp
 import numpy as np
 
-from pygdsm.utils import hpix2sky, sky2hpix
+from pygdsm.utils import hpix2sky, hpix2sky_fast, pix2ang_cached, sky2hpix
 
 
 def test_pix2sky():
@@ -13,5 +13,40 @@ def test_pix2sky():
     assert np.allclose(pix, pix_roundtrip)
 
 
+def test_pix2sky_fast():
+    """Round trip pixel_id to and from angles, using plain arrays instead of SkyCoords"""
+    NSIDE = 32
+    pix = np.arange(hp.nside2npix(NSIDE))
+    gl, gb = hpix2sky_fast(NSIDE, pix)
+    pix_roundtrip = hp.ang2pix(NSIDE, gl, gb, lonlat=True)
+    assert np.array_equal(pix, pix_roundtrip)
+
+
+def test_hpix2sky_fast():
+    NSIDE = 32
+    pix = np.arange(hp.nside2npix(NSIDE))
+    gl, gb = hpix2sky_fast(NSIDE, pix)
+    sc = hpix2sky(NSIDE, pix)
+    assert np.allclose(gl, sc.l.deg)
+    assert np.allclose(gb, sc.b.deg)
+    assert np.array_equal(sky2hpix(NSIDE, sc.icrs), pix)
+
+
+def test_pix2ang_cached():
+    NSIDE = 32
+    theta, phi = pix2ang_cached(NSIDE)
+    theta_ref, phi_ref = hp.pix2ang(NSIDE, np.arange(hp.nside2npix(NSIDE)))
+    assert np.array_equal(theta, theta_ref)
+    assert np.array_equal(phi, phi_ref)
+    assert pix2ang_cached(NSIDE) is theta.base
+    assert not theta.flags.writeable
+
+    theta_n, _ = pix2ang_cached(NSIDE, nest=True)
+    assert np.array_equal(theta_n, hp.pix2ang(NSIDE, np.arange(hp.nside2npix(NSIDE)), nest=True)[0])
+
+
 if __name__ == "__main__":
     test_pix2sky()
+    test_pix2sky_fast()
+    test_hpix2sky_fast()
+    test_pix2ang_cached()